@@ -1,120 +1,297 @@
+import asyncio
+import aiodns
+import pycares
 import streamlit as st
 import joblib
+import numpy as np
 import pandas as pd
 from urllib.parse import urlparse
-from datetime import datetime
 import socket
-import ssl
-import requests
 import base64
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
+from features import extract_features
+
 # -----------------------------
 # 1. Load the trained XGBoost pipeline
 # -----------------------------
-pipeline = joblib.load("xgb_pipeline.pkl")  # your single trained pipeline
+@st.cache_resource(show_spinner=False)
+def load_pipeline():
+    # loaded once per process and shared by all sessions, instead of being
+    # unpickled again on every rerun
+    return joblib.load("xgb_pipeline.pkl")
+
+@st.cache_resource(show_spinner=False)
+def load_onnx_session():
+    # compiled copy of the classifier written by predictor_fixed.py, if present;
+    # ignored when older than the pickle, i.e. left over from a previous training run
+    onnx_path, pkl_path = Path("xgb_pipeline.onnx"), Path("xgb_pipeline.pkl")
+    if not onnx_path.exists() or onnx_path.stat().st_mtime < pkl_path.stat().st_mtime:
+        return None
+    import onnxruntime as ort  # only loaded when there is a model to run
+    return ort.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+
+pipeline = load_pipeline()  # your single trained pipeline
+onnx_session = load_onnx_session()
+
+# column name -> position in a feature row, in the order the model expects
+FEATURE_IDX = {c: i for i, c in enumerate(pipeline.feature_names_in_)}
+
+def predict_phishing_proba(x: np.ndarray) -> np.ndarray:
+    # phishing probability for each float32 row of x (FEATURE_IDX order)
+    if onnx_session is None:
+        return pipeline.predict_proba(pd.DataFrame(x, columns=pipeline.feature_names_in_))[:, 1]
+    return onnx_session.run(None, {"input": x})[1][:, 1]
 
 # -----------------------------
 # 2. Utility functions
 # -----------------------------
-def domain_exists(domain: str) -> int:
-    if not domain:
-        return 0
-    try:
-        socket.gethostbyname(domain)
-        return 1
-    except:
-        return 0
+@st.cache_resource(show_spinner=False)
+def _ttl_store() -> dict:
+    # (func name, hostname/ip) -> (value, expiry); survives script reruns
+    return {}
+
+def ttl_cache(ttl: int, fallback=None):
+    # Memoize a check by its last positional argument (the hostname or IP).
+    # st.cache_data cannot wrap coroutines, so both sync and async checks
+    # share this store instead. Only definitive answers are stored, negative
+    # ones included (no DNS record, no URLhaus results). A check reports a
+    # transient failure (timeout, non-200, unexpected reply) by raising; the
+    # caller then gets `fallback` and the next call tries again.
+    def decorator(func):
+        store = _ttl_store()
+
+        def lookup(arg):
+            hit = store.get((func.__name__, arg))
+            if hit is not None and hit[1] > time.monotonic():
+                return True, hit[0]
+            return False, None
+
+        def remember(arg, value):
+            now = time.monotonic()
+            # prune expired entries so the store doesn't grow for the life of the process
+            for key, (_, expiry) in list(store.items()):
+                if expiry <= now:
+                    store.pop(key, None)
+            store[(func.__name__, arg)] = (value, now + ttl)
+            return value
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args):
+                found, value = lookup(args[-1])
+                if found:
+                    return value
+                try:
+                    value = await func(*args)
+                except Exception:
+                    return fallback
+                return remember(args[-1], value)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args):
+                found, value = lookup(args[-1])
+                if found:
+                    return value
+                try:
+                    value = func(*args)
+                except Exception:
+                    return fallback
+                return remember(args[-1], value)
+        return wrapper
+    return decorator
 
-def dns_a_record(domain: str):
+@st.cache_resource(show_spinner=False)
+def get_dns():
+    # One resolver (one c-ares channel) for the whole process. aiodns creates
+    # its futures on the loop it was built with, so the resolver gets its own
+    # long-lived loop thread; analyses and prewarm threads, each on their own
+    # asyncio.run() loop, hand lookups to it with run_coroutine_threadsafe.
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="dns", daemon=True).start()
+    return loop, aiodns.DNSResolver(loop=loop, timeout=2)
+
+async def _resolve_a(resolver: aiodns.DNSResolver, domain: str):
+    # getaddrinfo honours /etc/hosts and IP literals, like socket.gethostbyname
+    result = await resolver.getaddrinfo(domain, family=socket.AF_INET)
+    if not result.nodes:
+        return None
+    addr = result.nodes[0].addr[0]
+    return addr.decode() if isinstance(addr, bytes) else addr
+
+@ttl_cache(300)
+async def dns_a_record(domain: str):
+    if not domain:
+        return None
+    loop, resolver = get_dns()
     try:
-        return socket.gethostbyname(domain)
-    except:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_resolve_a(resolver, domain), loop))
+    except aiodns.error.DNSError as e:
+        # "no such host" / "no A record" is an answer; timeouts are not
+        if e.args[0] in (pycares.errno.ARES_ENOTFOUND, pycares.errno.ARES_ENODATA):
+            return None
+        raise
+    except ValueError:
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_session():
+    # One pooled session for all HTTP checks; keep-alive lets later checks
+    # reuse the TLS connection instead of paying a fresh handshake.
+    # requests is imported here so the page renders without loading it.
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@ttl_cache(300, fallback="No/Invalid SSL")
 def ssl_check(hostname: str) -> str:
     if not hostname:
         return "No hostname"
+    import requests  # a sys.modules lookup after the first import
     try:
-        ctx = ssl.create_default_context()
-        with ctx.wrap_socket(socket.socket(), server_hostname=hostname) as s:
-            s.settimeout(4)
-            s.connect((hostname, 443))
-            cert = s.getpeercert()
-            return "Valid SSL"
-    except:
+        # any HTTP response means the certificate verified during the handshake
+        get_session().head(f"https://{hostname}", timeout=4, verify=True)
+        return "Valid SSL"
+    except requests.exceptions.SSLError:
         return "No/Invalid SSL"
 
+@ttl_cache(3600, fallback="Unknown")
 def geo_country(ip: str):
     if not ip:
         return "Unknown"
-    try:
-        resp = requests.get(f"http://ip-api.com/json/{ip}?fields=country", timeout=4)
-        if resp.status_code == 200:
-            j = resp.json()
-            return j.get("country", "Unknown")
-        return "Unknown"
-    except:
-        return "Unknown"
+    resp = get_session().get(f"http://ip-api.com/json/{ip}?fields=country", timeout=4)
+    resp.raise_for_status()
+    return resp.json().get("country", "Unknown")
 
+@ttl_cache(3600, fallback="Unknown")
 def reputation_check_urlhaus(hostname: str):
     if not hostname:
         return "Unknown"
-    try:
-        resp = requests.post("https://urlhaus-api.abuse.ch/v1/host/", data={"host": hostname}, timeout=6)
-        if resp.status_code == 200 and "query_status" in resp.text.lower():
-            if "no results" in resp.text.lower():
-                return "Clean"
-            return "⚠ Blacklisted"
-        return "Unknown"
-    except:
-        return "Unknown"
+    resp = get_session().post("https://urlhaus-api.abuse.ch/v1/host/", data={"host": hostname}, timeout=6)
+    resp.raise_for_status()
+    text = resp.text.lower()
+    if "query_status" not in text:
+        raise ValueError("unexpected URLhaus response")
+    if "no results" in text:
+        return "Clean"
+    return "⚠ Blacklisted"
 
-# -----------------------------
-# 3. Feature extraction (all expected columns)
-# -----------------------------
-def extract_features(url: str) -> pd.DataFrame:
+def hostname_of(url: str) -> str:
     parsed = urlparse(url if url.startswith(("http://", "https://")) else "http://" + url)
-    hostname = parsed.hostname or ""
-    path = parsed.path or ""
-
-    features = {
-        "url_len": len(url),
-        "length_hostname": len(hostname),
-        "nb_dots": url.count("."),
-        "nb_hyphens": url.count("-"),
-        "nb_at": url.count("@"),
-        "nb_slash": url.count("/"),
-        "ip": 1 if hostname.replace('.', '').isdigit() else 0,
-        "nb_underscore": url.count("_"),
-        "nb_eq": url.count("="),
-        "nb_percent": url.count("%"),
-        "nb_and": url.count("&"),
-        "nb_or": url.count("|"),
-        "nb_qm": url.count("?"),
-        "nb_star": url.count("*"),
-        "nb_colon": url.count(":"),
-        "nb_dollar": url.count("$"),
-        "nb_comma": url.count(","),
-        "nb_semicolumn": url.count(";"),
-        "nb_space": url.count(" "),
-        "nb_www": 1 if "www." in url.lower() else 0,
-        "length_words_raw": len(url.split("/")),
-        "longest_word_path": max((len(w) for w in path.split("/") if w), default=0),
-        "shortest_word_path": min((len(w) for w in path.split("/") if w), default=0),
-        "longest_word_host": max((len(w) for w in hostname.split(".") if w), default=0),
-        "shortest_word_host": min((len(w) for w in hostname.split(".") if w), default=0),
-    }
+    return parsed.hostname or parsed.path.split("/")[0]
+
+def score_url(url: str) -> float:
+    row = extract_features(url, FEATURE_IDX)
+    return predict_phishing_proba(row.reshape(1, -1))[0]
+
+def scan_many(urls) -> np.ndarray:
+    # Score a batch with one predict call on the stacked feature matrix
+    # instead of one call per URL.
+    X = np.vstack([extract_features(u, FEATURE_IDX) for u in urls])
+    return predict_phishing_proba(X)
+
+@st.cache_resource(show_spinner=False)
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="checks")
+
+@st.cache_resource(show_spinner=False)
+def _pending_checks():
+    # (check name, hostname/ip) -> Future of the lookup currently in flight
+    return {}, threading.RLock()
+
+def run_check(func, arg) -> Future:
+    # Start func(arg), or return the Future of the same check if it is already
+    # running, so a click right after prewarm waits on those lookups instead
+    # of repeating them against the rate-limited services. Coroutine checks
+    # run on the resolver loop, the rest in the shared executor.
+    pending, lock = _pending_checks()
+    key = (func.__name__, arg)
+    with lock:
+        fut = pending.get(key)
+        if fut is None:
+            if asyncio.iscoroutinefunction(func):
+                fut = asyncio.run_coroutine_threadsafe(func(arg), get_dns()[0])
+            else:
+                fut = get_executor().submit(func, arg)
+            pending[key] = fut
+
+            def done(f, key=key):
+                with lock:
+                    if pending.get(key) is f:
+                        del pending[key]
+
+            fut.add_done_callback(done)
+    return fut
 
-    # Add defaults for remaining pipeline features
-    for col in pipeline.feature_names_in_:
-        if col not in features:
-            features[col] = 0
+# Resolve DNS first: a host that does not resolve is reported as phishing
+# without running the model or the other checks. Otherwise the remaining
+# checks and the model run concurrently, so the total time is roughly the
+# slowest single check.
+async def analyze(url: str) -> dict:
+    hostname = hostname_of(url)
 
-    return pd.DataFrame([features])
+    loop = asyncio.get_running_loop()
+    dns_ip = await asyncio.wrap_future(run_check(dns_a_record, hostname))
+    result = {"hostname": hostname, "dns_ip": dns_ip, "domain_ok": 1 if dns_ip else 0}
+    if dns_ip is None:
+        return result
+
+    prob, ssl_status, country, rep = await asyncio.gather(
+        loop.run_in_executor(None, score_url, url),
+        asyncio.wrap_future(run_check(ssl_check, hostname)),
+        asyncio.wrap_future(run_check(geo_country, dns_ip)),
+        asyncio.wrap_future(run_check(reputation_check_urlhaus, hostname)),
+    )
+    result.update({"prob": prob, "ssl_status": ssl_status, "country": country, "rep": rep})
+    return result
+
+# Run a host check for a batch: one lookup per distinct host, run concurrently
+async def check_many(func, urls) -> list:
+    hostnames = [hostname_of(u) for u in urls]
+    unique = sorted(set(hostnames))
+    results = await asyncio.gather(*(asyncio.wrap_future(run_check(func, h)) for h in unique))
+    by_host = dict(zip(unique, results))
+    return [by_host[h] for h in hostnames]
+
+async def batch_checks(urls):
+    return await asyncio.gather(
+        check_many(dns_a_record, urls),
+        check_many(reputation_check_urlhaus, urls),
+    )
+
+# Same verdict for "Check URL" and the batch table: a host that does not
+# resolve is phishing whatever the model says
+def verdict(dns_ip, prob) -> str:
+    if dns_ip is None:
+        return "釣魚網站(網域無法解析)"
+    return "釣魚網站" if prob > 0.5 else "正常網站"
+
+def _warm_host(hostname: str):
+    # same order as analyze(): nothing else is checked if DNS fails
+    ip = run_check(dns_a_record, hostname).result()
+    if ip:
+        run_check(ssl_check, hostname)
+        run_check(geo_country, ip)
+        run_check(reputation_check_urlhaus, hostname)
+
+def prewarm():
+    # on_change callback for the URL box: start the slow lookups in the
+    # background so "Check URL" finds them cached or still in flight
+    url = st.session_state.url.strip()
+    if url:
+        get_executor().submit(_warm_host, hostname_of(url))
 
 # -----------------------------
-# 4. Streamlit UI
+# 3. Streamlit UI
 # -----------------------------
 st.markdown(
     """
@@ -133,28 +310,14 @@ st.markdown('<h2 style="text-align:center;">網路釣魚網址預測器 (Phishin
 st.markdown("<br>", unsafe_allow_html=True)
 st.markdown('<h4 style="text-align:center;">輸入單一網址即可獲得預測結果和多項安全檢查。此過程使用您已訓練的兩個模型（內容模型和結構模型）。</h4>',unsafe_allow_html=True)
 
-url_input = st.text_input("Enter a URL:")
+url_input = st.text_input("Enter a URL:", key="url", on_change=prewarm)
 
 if st.button("Check URL") and url_input.strip():
     with st.spinner("Analyzing..."):
         try:
-            parsed = urlparse(url_input if url_input.startswith(("http://", "https://")) else "http://" + url_input)
-            hostname = parsed.hostname or parsed.path.split("/")[0]
-
-            # Extract features and predict
-            X = extract_features(url_input)
-            prob = pipeline.predict_proba(X)[0][1]
-            label = "釣魚網站" if prob > 0.5 else "正常網站"
-
-            # Additional checks
-            domain_ok = domain_exists(hostname)
-            dns_ip = dns_a_record(hostname)
-            ssl_status = ssl_check(hostname)
-            country = geo_country(dns_ip) if dns_ip else "Unknown"
-            rep = reputation_check_urlhaus(hostname)
-
-            if domain_ok == 0:
-                label = "釣魚網站(網域無法解析)"
+            checks = asyncio.run(analyze(url_input))
+            domain_ok = checks["domain_ok"]
+            label = verdict(checks["dns_ip"], checks.get("prob"))
 
             # Display results
             if "釣魚" in label.lower():
@@ -163,25 +326,45 @@ if st.button("Check URL") and url_input.strip():
                 st.success(f"{label}")
 
             st.subheader("Additional checks")
-            st.write(f"**Domain:** {hostname}")
-            st.write(f"**DNS A record:** {dns_ip if dns_ip else 'None'}")
+            st.write(f"**Domain:** {checks['hostname']}")
+            st.write(f"**DNS A record:** {checks['dns_ip'] if checks['dns_ip'] else 'None'}")
             st.write(f"**Domain exists:** {'Yes' if domain_ok else 'No'}")
-            st.write(f"**SSL:** {ssl_status}")
-            st.write(f"**IP geolocation:** {country}")
-            st.write(f"**Reputation (URLhaus):** {rep}")
+            if domain_ok:
+                st.write(f"**SSL:** {checks['ssl_status']}")
+                st.write(f"**IP geolocation:** {checks['country']}")
+                st.write(f"**Reputation (URLhaus):** {checks['rep']}")
 
         except Exception as e:
             st.error(f"Error during analysis: {e}")
 
+with st.expander("Scan multiple URLs"):
+    batch_input = st.text_area("Enter one URL per line:")
+    batch_urls = [u.strip() for u in batch_input.splitlines() if u.strip()]
+    if st.button("Scan URLs") and batch_urls:
+        with st.spinner("Analyzing..."):
+            try:
+                probs = scan_many(batch_urls)
+                ips, reps = asyncio.run(batch_checks(batch_urls))
+                st.dataframe(pd.DataFrame({
+                    "URL": batch_urls,
+                    "Phishing probability": probs.round(3),
+                    "Result": [verdict(ip, p) for ip, p in zip(ips, probs)],
+                    "Reputation (URLhaus)": reps,
+                }), width="stretch")
+            except Exception as e:
+                st.error(f"Error during analysis: {e}")
+
+@st.cache_data(show_spinner=False)
+def load_b64(path: str) -> str:
+    # encode each image once instead of on every rerun
+    return base64.b64encode(Path(path).read_bytes()).decode("utf-8")
+
 img_path = Path("phishing.jpg")
 
 if not img_path.exists():
     st.error("Image not found: place phishing.jpg in app folder")
 else:
-    with open(img_path, "rb") as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode("utf-8")
-    img_src = f"data:image/jpeg;base64,{b64}"
+    img_src = f"data:image/jpeg;base64,{load_b64(str(img_path))}"
 
     html = f"""
     <div style="
@@ -220,10 +403,7 @@ img_path = Path("phishing_effects.jpg")
 if not img_path.exists():
     st.error("Image not found: place phishing.jpg in app folder")
 else:
-    with open(img_path, "rb") as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode("utf-8")
-    img_src = f"data:image/jpeg;base64,{b64}"
+    img_src = f"data:image/jpeg;base64,{load_b64(str(img_path))}"
 
 
     html = f"""
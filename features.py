@@ -0,0 +1,89 @@
+# features.py
+# URL feature extraction for the Streamlit app.
+import socket
+import numpy as np
+from numba import njit
+from urllib.parse import urlparse
+
+# -----------------------------
+# 1. Character-count kernel
+# -----------------------------
+# Feature name -> character it counts. Order defines the slot in the kernel output.
+CHAR_FEATURES = {
+    "nb_dots": ".",
+    "nb_hyphens": "-",
+    "nb_at": "@",
+    "nb_slash": "/",
+    "nb_underscore": "_",
+    "nb_eq": "=",
+    "nb_percent": "%",
+    "nb_and": "&",
+    "nb_or": "|",
+    "nb_qm": "?",
+    "nb_star": "*",
+    "nb_colon": ":",
+    "nb_dollar": "$",
+    "nb_comma": ",",
+    "nb_semicolumn": ";",
+    "nb_space": " ",
+}
+
+# byte value -> output slot, -1 for bytes we don't count
+_CHAR_SLOT = np.full(256, -1, dtype=np.int64)
+for _i, _c in enumerate(CHAR_FEATURES.values()):
+    _CHAR_SLOT[ord(_c)] = _i
+
+@njit(cache=True)
+def count_chars(buf, slots, out):
+    # single walk over the UTF-8 bytes; multi-byte characters never collide
+    # with the ASCII bytes we count
+    out[:] = 0
+    for i in range(len(buf)):
+        j = slots[buf[i]]
+        if j >= 0:
+            out[j] += 1
+    return out
+
+def char_counts(url: str) -> np.ndarray:
+    buf = np.frombuffer(url.encode(), dtype=np.uint8)
+    out = np.empty(len(CHAR_FEATURES), dtype=np.float32)
+    return count_chars(buf, _CHAR_SLOT, out)
+
+# -----------------------------
+# 2. Feature extraction (all expected columns)
+# -----------------------------
+def _is_ip_host(hostname: str) -> int:
+    # strict dotted-quad check; inet_aton would also accept "1.2" or "0x7f.1"
+    try:
+        socket.inet_pton(socket.AF_INET, hostname)
+        return 1
+    except OSError:
+        return 0
+
+def extract_features(url: str, col_index: dict) -> np.ndarray:
+    parsed = urlparse(url if url.startswith(("http://", "https://")) else "http://" + url)
+    hostname = parsed.hostname or ""
+    path = parsed.path or ""
+    lower = url.lower()
+
+    features = dict(zip(CHAR_FEATURES, char_counts(url)))
+    features.update({
+        "url_len": len(url),
+        "length_hostname": len(hostname),
+        "ip": _is_ip_host(hostname),
+        "nb_www": 1 if "www." in lower else 0,
+        "length_words_raw": len(url.split("/")),
+        "longest_word_path": max((len(w) for w in path.split("/") if w), default=0),
+        "shortest_word_path": min((len(w) for w in path.split("/") if w), default=0),
+        "longest_word_host": max((len(w) for w in hostname.split(".") if w), default=0),
+        "shortest_word_host": min((len(w) for w in hostname.split(".") if w), default=0),
+    })
+
+    # Fill a float32 row laid out by col_index (column name -> position);
+    # columns we don't compute stay 0 and features the model lacks are dropped
+    row = np.zeros(len(col_index), dtype=np.float32)
+    for name, value in features.items():
+        i = col_index.get(name)
+        if i is not None:
+            row[i] = value
+    return row
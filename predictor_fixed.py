@@ -2,17 +2,21 @@
 import pandas as pd
 import numpy as np
 import joblib
+from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from xgboost import XGBClassifier
+import onnx
+from onnxmltools import convert_xgboost
+from onnxmltools.convert.common.data_types import FloatTensorType
 from sklearn.metrics import accuracy_score, classification_report
 
 # -----------------------------
 # 1. Load dataset
 # -----------------------------
-df = pd.read_csv("Training.csv")  # replace with your CSV path
+df = pd.read_csv("Training.csv", engine="pyarrow")  # replace with your CSV path
 
 # Encode target labels
 y = df['status'].map({'legitimate': 0, 'phishing': 1})
@@ -57,14 +61,29 @@ pipeline = Pipeline([
         subsample=0.8,
         colsample_bytree=0.8,
         n_jobs=-1,
-        eval_metric='logloss'
+        eval_metric='logloss',
+        early_stopping_rounds=30
     ))
 ])
 
 # -----------------------------
 # 5. Train the pipeline
 # -----------------------------
-print("Training XGBoost pipeline...")
+# Early-stop on a validation slice to find how many trees actually help,
+# then refit on the full training set with exactly that many. Fewer trees
+# means a smaller pickle and faster scoring in the app.
+X_fit, X_val, y_fit, y_val = train_test_split(
+    X_train, y_train, test_size=0.1, random_state=42, stratify=y_train
+)
+X_val_t = preprocessor.fit(X_fit).transform(X_val)
+
+print("Training XGBoost pipeline (early stopping)...")
+pipeline.fit(X_fit, y_fit, classifier__eval_set=[(X_val_t, y_val)], classifier__verbose=False)
+best_n = pipeline.named_steps["classifier"].best_iteration + 1
+print(f"Best number of trees: {best_n}")
+
+print("Refitting XGBoost pipeline on the full training set...")
+pipeline.set_params(classifier__n_estimators=best_n, classifier__early_stopping_rounds=None)
 pipeline.fit(X_train, y_train)
 
 # -----------------------------
@@ -80,3 +99,18 @@ print(classification_report(y_test, y_pred))
 # -----------------------------
 joblib.dump(pipeline, "xgb_pipeline.pkl")
 print("✅ Pipeline saved as xgb_pipeline.pkl")
+
+# -----------------------------
+# 8. Export classifier to ONNX
+# -----------------------------
+# With only numeric columns the preprocessor is a passthrough, so the app can
+# feed feature_names_in_ columns straight into the compiled classifier.
+if categorical_cols:
+    # remove any export from an earlier run so the app can't serve a stale model
+    Path("xgb_pipeline.onnx").unlink(missing_ok=True)
+    print("⚠ Skipping ONNX export: categorical columns need the sklearn preprocessor")
+else:
+    initial_type = [("input", FloatTensorType([None, len(numeric_cols)]))]
+    onx = convert_xgboost(pipeline.named_steps["classifier"], initial_types=initial_type)
+    onnx.save_model(onx, "xgb_pipeline.onnx")
+    print("✅ Classifier exported as xgb_pipeline.onnx")